@@ -1,9 +1,19 @@
 import os
+import re
+import shlex
+from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import yaml
 
+# Use the libyaml-backed loader when PyYAML was built with it, it parses
+# significantly faster than the pure-Python SafeLoader.
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:  # pragma: no cover - depends on how PyYAML was built
+    from yaml import SafeLoader as _YamlLoader  # type: ignore[assignment]
+
 
 class ConfigError(Exception):
     """Exception raised for errors in the HooksMCP configuration."""
@@ -14,6 +24,8 @@ class ConfigError(Exception):
 class PromptArgument:
     """Represents an argument for a prompt template."""
 
+    __slots__ = ("name", "description", "required")
+
     def __init__(
         self,
         name: str,
@@ -42,6 +54,15 @@ class PromptArgument:
 class Prompt:
     """Represents a prompt template."""
 
+    __slots__ = (
+        "name",
+        "description",
+        "prompt_text",
+        "prompt_file",
+        "arguments",
+        "_prompt_file_cache",
+    )
+
     def __init__(
         self,
         name: str,
@@ -55,6 +76,8 @@ class Prompt:
         self.prompt_text = prompt_text
         self.prompt_file = prompt_file
         self.arguments = arguments or []
+        # (path, mtime_ns, size, inode) of the prompt file, and its content
+        self._prompt_file_cache: Optional[Tuple[Tuple[str, int, int, int], str]] = None
 
         # Validate that exactly one of prompt_text or prompt_file is provided
         if prompt_text is None and prompt_file is None:
@@ -66,6 +89,31 @@ class Prompt:
                 f"HooksMCP Error: Prompt '{name}' cannot specify both 'prompt' and 'prompt-file'"
             )
 
+    def read_prompt_file(self, config_dir: Path) -> str:
+        """
+        Read the prompt file relative to config_dir.
+
+        The content is cached, and only read again when the file's modification time,
+        size or inode changes, so edits are picked up without a restart.
+        """
+        if not self.prompt_file:
+            raise ConfigError(
+                f"HooksMCP Error: Prompt '{self.name}' has no prompt file"
+            )
+
+        prompt_file_path = os.path.join(config_dir, self.prompt_file)
+        stat = os.stat(prompt_file_path)
+        signature = (prompt_file_path, stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+        cached = self._prompt_file_cache
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+
+        with open(prompt_file_path, encoding="utf-8") as f:
+            text = f.read()
+        self._prompt_file_cache = (signature, text)
+        return text
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any], config_dir: Path) -> "Prompt":
         """Create a Prompt from a dictionary."""
@@ -113,7 +161,7 @@ class Prompt:
                 except Exception as e:
                     raise ConfigError(
                         f"HooksMCP Error: Failed to parse argument[{i}] for prompt '{name}': {str(e)}"
-                    )
+                    ) from e
 
         prompt = cls(name, description, prompt_text, prompt_file, arguments)
 
@@ -128,7 +176,7 @@ class Prompt:
         return prompt
 
 
-class ParameterType:
+class ParameterType(str, Enum):
     """Enumeration of parameter types."""
 
     PROJECT_FILE_PATH = "project_file_path"
@@ -136,19 +184,30 @@ class ParameterType:
     OPTIONAL_ENV_VAR = "optional_env_var"
     INSECURE_STRING = "insecure_string"
 
+    def __str__(self) -> str:
+        return self.value
+
+
+# Parameter types read from the environment rather than provided by the client
+ENV_VAR_PARAMETER_TYPES = frozenset(
+    {ParameterType.REQUIRED_ENV_VAR, ParameterType.OPTIONAL_ENV_VAR}
+)
+
 
 class ActionParameter:
     """Represents a parameter for an action."""
 
+    __slots__ = ("name", "type", "description", "default")
+
     def __init__(
         self,
         name: str,
-        param_type: str,
+        param_type: Union[ParameterType, str],
         description: Optional[str] = None,
         default: Optional[str] = None,
     ):
         self.name = name
-        self.type = param_type
+        self.type = ParameterType(param_type)
         self.description = description
         self.default = default
 
@@ -156,7 +215,7 @@ class ActionParameter:
         """Convert parameter to dictionary for MCP tool definition."""
         result = {
             "name": self.name,
-            "type": self.type,
+            "type": self.type.value,
             "description": self.description or f"Parameter {self.name}",
         }
         if self.default is not None:
@@ -167,6 +226,22 @@ class ActionParameter:
 class Action:
     """Represents a single action defined in the configuration."""
 
+    __slots__ = (
+        "name",
+        "description",
+        "command",
+        "command_tokens",
+        "parameters",
+        "env_parameters",
+        "path_parameters",
+        "string_parameters",
+        "required_env_var_names",
+        "run_path",
+        "timeout",
+        "parameter_pattern",
+        "input_schema",
+    )
+
     def __init__(
         self,
         name: str,
@@ -183,6 +258,67 @@ class Action:
         self.run_path = run_path
         self.timeout = timeout
 
+        # Partition parameters by type once, so running the action doesn't have to
+        # branch on each parameter's type
+        self.env_parameters: List[ActionParameter] = []
+        self.path_parameters: List[ActionParameter] = []
+        self.string_parameters: List[ActionParameter] = []
+        for param in self.parameters:
+            if param.type in ENV_VAR_PARAMETER_TYPES:
+                self.env_parameters.append(param)
+            elif param.type is ParameterType.PROJECT_FILE_PATH:
+                self.path_parameters.append(param)
+            else:
+                self.string_parameters.append(param)
+        self.required_env_var_names: Tuple[str, ...] = tuple(
+            param.name
+            for param in self.env_parameters
+            if param.type is ParameterType.REQUIRED_ENV_VAR
+        )
+
+        # Tokenize the command template once, so invalid shell syntax is reported
+        # when the configuration is loaded rather than when the action is run
+        try:
+            self.command_tokens: Tuple[str, ...] = tuple(shlex.split(command))
+        except ValueError as e:
+            raise ConfigError(
+                f"HooksMCP Error: Invalid command syntax for action '{name}': {e}"
+            ) from e
+
+        # Single pattern matching every $PARAM placeholder used in the command.
+        # Longer names come first so $PREFIX_SUFFIX is matched before $PREFIX.
+        # Actions that only consume parameters as env vars get no pattern and
+        # skip substitution entirely.
+        names = sorted(
+            (param.name for param in self.parameters if f"${param.name}" in command),
+            key=len,
+            reverse=True,
+        )
+        self.parameter_pattern: Optional[re.Pattern[str]] = (
+            re.compile(r"\$(" + "|".join(re.escape(name) for name in names) + ")")
+            if names
+            else None
+        )
+
+        # JSON schema for the MCP tool's input, built once since it never changes.
+        # Env var parameters are read from the environment, not provided by the client.
+        properties: Dict[str, Any] = {}
+        required: List[str] = []
+        for param in self.parameters:
+            if param.type in ENV_VAR_PARAMETER_TYPES:
+                continue
+            properties[param.name] = {
+                "type": "string",
+                "description": param.description,
+            }
+            if param.default is None:
+                required.append(param.name)
+        self.input_schema: Dict[str, Any] = {
+            "type": "object",
+            "properties": properties,
+            "required": required,
+        }
+
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> "Action":
         """Create an Action from a dictionary."""
@@ -216,16 +352,13 @@ class Action:
                         f"HooksMCP Error: 'type' is required for parameter '{param_name}' in action '{name}'"
                     )
 
-                if param_type not in [
-                    ParameterType.PROJECT_FILE_PATH,
-                    ParameterType.REQUIRED_ENV_VAR,
-                    ParameterType.OPTIONAL_ENV_VAR,
-                    ParameterType.INSECURE_STRING,
-                ]:
+                try:
+                    param_type = ParameterType(param_type)
+                except ValueError as e:
                     raise ConfigError(
                         f"HooksMCP Error: Invalid parameter type '{param_type}' for parameter '{param_name}' in action '{name}'. "
-                        f"Valid types are: project_file_path, required_env_var, optional_env_var, insecure_string"
-                    )
+                        f"Valid types are: {', '.join(t.value for t in ParameterType)}"
+                    ) from e
 
                 parameters.append(
                     ActionParameter(
@@ -243,9 +376,24 @@ class Action:
         )
 
 
+# Parsed configurations keyed by (class, absolute path, mtime_ns, size)
+_CONFIG_CACHE_SIZE = 32
+_config_cache: Dict[Tuple[type, str, int, int], "HooksMCPConfig"] = {}
+
+
 class HooksMCPConfig:
     """Main configuration class for HooksMCP."""
 
+    __slots__ = (
+        "actions",
+        "prompts",
+        "actions_by_name",
+        "get_prompt_tool_filter",
+        "get_prompt_tool_filter_set",
+        "server_name",
+        "server_description",
+    )
+
     def __init__(
         self,
         actions: List[Action],
@@ -256,6 +404,12 @@ class HooksMCPConfig:
     ):
         self.actions = actions
         self.prompts = prompts or []
+
+        # Index actions by name for constant-time lookup when tools are called.
+        # The first action wins if names are duplicated.
+        self.actions_by_name: Dict[str, Action] = {}
+        for action in actions:
+            self.actions_by_name.setdefault(action.name, action)
         self.get_prompt_tool_filter = get_prompt_tool_filter
         self.server_name = server_name or "HooksMCP"
         self.server_description = (
@@ -266,32 +420,93 @@ class HooksMCPConfig:
         # Validate get_prompt_tool_filter if provided
         if self.get_prompt_tool_filter is not None:
             prompt_names = {prompt.name for prompt in self.prompts}
-            for filter_name in self.get_prompt_tool_filter:
-                if filter_name not in prompt_names:
-                    raise ConfigError(
-                        f"HooksMCP Error: Prompt '{filter_name}' in get_prompt_tool_filter not found in prompts list"
-                    )
+            # Report every unknown name at once, rather than one per attempt
+            missing = [
+                filter_name
+                for filter_name in self.get_prompt_tool_filter
+                if filter_name not in prompt_names
+            ]
+            if missing:
+                missing_list = ", ".join(f"'{name}'" for name in missing)
+                raise ConfigError(
+                    f"HooksMCP Error: {'Prompts' if len(missing) > 1 else 'Prompt'} {missing_list} "
+                    "in get_prompt_tool_filter not found in prompts list"
+                )
+
+        # Set form of the filter for constant-time membership checks. Only
+        # meaningful when get_prompt_tool_filter is set.
+        self.get_prompt_tool_filter_set = frozenset(self.get_prompt_tool_filter or ())
 
     @classmethod
     def from_yaml(cls, yaml_path: str) -> "HooksMCPConfig":
-        """Load configuration from a YAML file."""
-        if not os.path.exists(yaml_path):
+        """
+        Load configuration from a YAML file.
+
+        Parsed configurations are cached by file path, modification time and size,
+        so loading an unchanged file again returns the same instance. Callers
+        should treat the result as read-only.
+        """
+        try:
+            stat = os.stat(yaml_path)
+        except OSError as e:
             raise ConfigError(
                 f"HooksMCP Error: Configuration file '{yaml_path}' not found"
-            )
+            ) from e
+
+        cache_key = (cls, os.path.abspath(yaml_path), stat.st_mtime_ns, stat.st_size)
+        config = _config_cache.get(cache_key)
+        if config is None:
+            config = cls._parse_yaml(yaml_path)
+            if len(_config_cache) >= _CONFIG_CACHE_SIZE:
+                # Evict the oldest entry
+                del _config_cache[next(iter(_config_cache))]
+            _config_cache[cache_key] = config
+        return config
 
+    @classmethod
+    def _parse_yaml(cls, yaml_path: str) -> "HooksMCPConfig":
+        """Parse and validate a configuration file, without caching."""
         try:
-            with open(yaml_path, "r") as f:
-                data = yaml.safe_load(f)
+            # Read the whole (small) file as bytes up front, so the loader parses
+            # one buffer and libyaml handles the decoding directly
+            with open(yaml_path, "rb") as f:
+                raw = f.read()
+            data = yaml.load(raw, Loader=_YamlLoader)
         except yaml.YAMLError as e:
             raise ConfigError(
                 f"HooksMCP Error: Failed to parse YAML file '{yaml_path}': {str(e)}"
-            )
+            ) from e
         except Exception as e:
             raise ConfigError(
                 f"HooksMCP Error: Failed to read configuration file '{yaml_path}': {str(e)}"
-            )
+            ) from e
+
+        return cls._from_data(data, Path(yaml_path).parent)
 
+    @classmethod
+    def from_yaml_string(
+        cls, yaml_content: str, config_dir: Optional[str] = None
+    ) -> "HooksMCPConfig":
+        """
+        Load configuration from a YAML string, without reading a configuration file.
+
+        Args:
+            yaml_content: The configuration as YAML
+            config_dir: Directory that prompt-file paths are relative to (default: current directory)
+
+        Returns:
+            The parsed configuration
+        """
+        try:
+            data = yaml.load(yaml_content, Loader=_YamlLoader)
+        except yaml.YAMLError as e:
+            raise ConfigError(f"HooksMCP Error: Failed to parse YAML: {str(e)}") from e
+
+        return cls._from_data(data, Path(config_dir or "."))
+
+    @classmethod
+    def _from_data(cls, data: Any, config_dir: Path) -> "HooksMCPConfig":
+        """Validate parsed YAML data and build the configuration."""
         if not isinstance(data, dict):
             raise ConfigError(
                 "HooksMCP Error: Configuration file must contain a YAML object"
@@ -316,7 +531,7 @@ class HooksMCPConfig:
             except Exception as e:
                 raise ConfigError(
                     f"HooksMCP Error: Failed to parse action[{i}]: {str(e)}"
-                )
+                ) from e
 
         # Parse prompts if present
         prompts = []
@@ -325,7 +540,6 @@ class HooksMCPConfig:
             if not isinstance(prompts_data, list):
                 raise ConfigError("HooksMCP Error: 'prompts' must be an array")
 
-            config_dir = Path(yaml_path).parent
             for i, prompt_data in enumerate(prompts_data):
                 if not isinstance(prompt_data, dict):
                     raise ConfigError(
@@ -340,7 +554,7 @@ class HooksMCPConfig:
                 except Exception as e:
                     raise ConfigError(
                         f"HooksMCP Error: Failed to parse prompt[{i}]: {str(e)}"
-                    )
+                    ) from e
 
         return cls(
             actions=actions,
@@ -352,10 +566,9 @@ class HooksMCPConfig:
 
     def validate_required_env_vars(self) -> List[str]:
         """Check which required environment variables are not set and return their names."""
-        missing_vars = []
-        for action in self.actions:
-            for param in action.parameters:
-                if param.type == ParameterType.REQUIRED_ENV_VAR:
-                    if not os.environ.get(param.name):
-                        missing_vars.append(param.name)
-        return missing_vars
+        # Variables shared by several actions are only checked and reported once
+        required_vars = {
+            name for action in self.actions for name in action.required_env_var_names
+        }
+        # Empty values count as missing
+        return sorted(name for name in required_vars if not os.environ.get(name))
@@ -1,11 +1,14 @@
 import os
-import shlex
+import re
+import selectors
 import subprocess
+import threading
 from pathlib import Path
-from typing import Any, Dict
+from time import monotonic
+from typing import IO, Any, Dict, Optional, Tuple
 
 from .config import Action, ParameterType
-from .utils import process_terminal_output, resolve_path, validate_project_path
+from .utils import process_terminal_output, validate_project_path
 
 
 class ExecutionError(Exception):
@@ -14,12 +17,112 @@ class ExecutionError(Exception):
     pass
 
 
+# Output kept per stream. Anything beyond this is discarded, so a very chatty
+# command can't exhaust the server's memory.
+MAX_OUTPUT_BYTES = 1024 * 1024
+
+_READ_CHUNK_SIZE = 64 * 1024
+
+# select() only accepts sockets on Windows, so pipes are read with threads there
+_USE_SELECTOR = os.name == "posix"
+
+
+def _append_output(buffer: bytearray, chunk: bytes, limit: int) -> None:
+    """Append a chunk of output, keeping up to limit + 1 bytes in buffer."""
+    remaining = limit + 1 - len(buffer)
+    if remaining > 0:
+        buffer += chunk[:remaining]
+
+
+def _read_stream(stream: IO[bytes], buffer: bytearray, limit: int) -> None:
+    """Read a pipe until EOF on a reader thread, then close it."""
+    fd = stream.fileno()
+    while chunk := os.read(fd, _READ_CHUNK_SIZE):
+        _append_output(buffer, chunk, limit)
+    stream.close()
+
+
+def _read_output(
+    stdout: IO[bytes], stderr: IO[bytes], deadline: float, limit: int
+) -> Optional[Tuple[bytearray, bytearray]]:
+    """
+    Read stdout and stderr until both reach EOF, keeping up to limit + 1 bytes of each.
+
+    Reading continues past the limit (discarding the data), so the child never
+    blocks on a full pipe. The extra byte lets the caller detect truncation.
+    Background processes started by the command may hold the pipes open after
+    the command itself exits, so reading stops at the deadline.
+
+    Returns:
+        The captured output, or None if the deadline passed first
+    """
+    stdout_buffer, stderr_buffer = bytearray(), bytearray()
+
+    if _USE_SELECTOR:
+        try:
+            with selectors.DefaultSelector() as selector:
+                selector.register(stdout, selectors.EVENT_READ, stdout_buffer)
+                selector.register(stderr, selectors.EVENT_READ, stderr_buffer)
+                while selector.get_map():
+                    remaining = deadline - monotonic()
+                    if remaining <= 0:
+                        return None
+                    for key, _ in selector.select(remaining):
+                        chunk = os.read(key.fd, _READ_CHUNK_SIZE)
+                        if chunk:
+                            _append_output(key.data, chunk, limit)
+                        else:
+                            selector.unregister(key.fileobj)
+        finally:
+            # Closing our read ends means background processes still holding
+            # the pipes can't keep anything in the server waiting on them
+            stdout.close()
+            stderr.close()
+    else:
+        readers = [
+            threading.Thread(
+                target=_read_stream, args=(pipe, buffer, limit), daemon=True
+            )
+            for pipe, buffer in ((stdout, stdout_buffer), (stderr, stderr_buffer))
+        ]
+        for reader in readers:
+            reader.start()
+        while alive := [reader for reader in readers if reader.is_alive()]:
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                # Closing a pipe under a blocked read isn't safe, so readers
+                # still waiting are left to finish (and close their pipe) when
+                # the processes holding it exit
+                return None
+            alive[0].join(remaining)
+
+    return stdout_buffer, stderr_buffer
+
+
+def _decode_output(buffer: bytearray, limit: int) -> str:
+    """Decode captured output once and process it as a terminal would show it."""
+    text = process_terminal_output(buffer[:limit].decode("utf-8", errors="replace"))
+    if len(buffer) > limit:
+        text += "\n(output truncated)"
+    return text
+
+
 class CommandExecutor:
     """Handles secure execution of commands defined in HooksMCP configuration."""
 
     def __init__(self):
         self.project_root = Path(os.getcwd())
 
+    @property
+    def project_root(self) -> Path:
+        return self._project_root
+
+    @project_root.setter
+    def project_root(self, project_root: Path) -> None:
+        self._project_root = project_root
+        # Resolve once up front, rather than on every path validation
+        self._resolved_project_root = project_root.resolve()
+
     def execute_action(
         self, action: Action, parameters: Dict[str, Any]
     ) -> Dict[str, Any]:
@@ -37,82 +140,109 @@ class CommandExecutor:
         env_vars = self._prepare_parameters(action, parameters)
 
         # Parse command and substitute parameters in command args
-        command_args = self._substitute_parameters(action.command, env_vars)
+        command_args = self._substitute_parameters(action, env_vars)
 
         # Determine execution directory
         execution_dir = self.project_root
         if action.run_path:
-            execution_dir = self.project_root / action.run_path
-            # Validate run_path is within project boundaries
-            if not validate_project_path(action.run_path, self.project_root):
-                raise ExecutionError(
-                    f"HooksMCP Error: Invalid run_path '{action.run_path}' for action '{action.name}'. "
-                    f"Path must be within project boundaries and not contain directory traversal sequences."
-                )
+            execution_dir = self._get_run_dir(action)
+
+        # Pass environment variables separately to avoid shell injection. With
+        # nothing to add, let the child inherit the environment rather than
+        # copying all of os.environ.
+        env = {**os.environ, **env_vars} if env_vars else None
 
         # Execute command
         try:
-            # Use subprocess.run with shell=False for security
-            # Pass environment variables separately to avoid shell injection
-            result = subprocess.run(
+            # Use shell=False for security
+            process: "subprocess.Popen[bytes]" = subprocess.Popen(
                 command_args,
                 cwd=execution_dir,
-                env={**os.environ, **env_vars},
-                capture_output=True,
-                text=True,
-                timeout=action.timeout,
+                env=env,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 shell=False,
             )
+            stdout_pipe, stderr_pipe = process.stdout, process.stderr
+            assert stdout_pipe is not None and stderr_pipe is not None
+
+            # Drain both pipes into size-capped buffers, with one deadline covering
+            # the output and the exit. Raw bytes are decoded once at the end;
+            # text mode would also turn carriage returns into newlines before we
+            # can collapse them.
+            limit = MAX_OUTPUT_BYTES
+            deadline = monotonic() + action.timeout
+            try:
+                output = _read_output(stdout_pipe, stderr_pipe, deadline, limit)
+                if output is None:
+                    raise subprocess.TimeoutExpired(command_args, action.timeout)
+                returncode = process.wait(timeout=max(deadline - monotonic(), 0))
+            except subprocess.TimeoutExpired:
+                process.kill()
+                process.wait()
+                raise
+            stdout, stderr = output
 
             return {
-                "stdout": process_terminal_output(result.stdout),
-                "stderr": process_terminal_output(result.stderr),
-                "status_code": result.returncode,
+                "stdout": _decode_output(stdout, limit),
+                "stderr": _decode_output(stderr, limit),
+                "status_code": returncode,
             }
-        except subprocess.TimeoutExpired:
+        except subprocess.TimeoutExpired as e:
             raise ExecutionError(
                 f"HooksMCP Error: Command for action '{action.name}' timed out after {action.timeout} seconds"
-            )
+            ) from e
         except Exception as e:
             raise ExecutionError(
                 f"HooksMCP Error: Failed to execute command for action '{action.name}': {str(e)}"
+            ) from e
+
+    def _get_run_dir(self, action: Action) -> str:
+        """
+        Validate an action's run_path and return the directory to run it in.
+
+        run_path comes from the configuration, but what it resolves to is up to
+        the filesystem (e.g. a directory later replaced by a symlink), so it's
+        validated on every call.
+        """
+        run_path = action.run_path or ""
+        # Validate run_path is within project boundaries
+        if not validate_project_path(
+            run_path, self._resolved_project_root, root_is_resolved=True
+        ):
+            raise ExecutionError(
+                f"HooksMCP Error: Invalid run_path '{action.run_path}' for action '{action.name}'. "
+                f"Path must be within project boundaries and not contain directory traversal sequences."
             )
+        return os.path.join(self.project_root, run_path)
 
-    def _substitute_parameters(self, command: str, env_vars: Dict[str, str]) -> list:
+    def _substitute_parameters(self, action: Action, env_vars: Dict[str, str]) -> list:
         """
         Parse command template and substitute parameter variables with their values.
 
         Args:
-            command: The command string containing $VARIABLE_NAME placeholders
+            action: The action whose command contains $VARIABLE_NAME placeholders
             env_vars: Dictionary of variable names to values
 
         Returns:
             List of command arguments with variables substituted
         """
-        # First parse the command template to understand shell syntax
-        try:
-            command_args = shlex.split(command)
-        except ValueError as e:
-            raise ExecutionError(f"HooksMCP Error: Invalid command syntax: {e}")
-
-        # Sort parameter names by length (descending) to handle collisions
-        # This ensures $PREFIX_SUFFIX is processed before $PREFIX
-        sorted_params = sorted(env_vars.keys(), key=len, reverse=True)
-
-        # Substitute parameters in each argument
-        substituted_args = []
-        for arg in command_args:
-            substituted_arg = arg
-            for param_name in sorted_params:
-                param_value = env_vars[param_name]
-                # Convert parameter value to string for substitution
-                # Note: quoting is not necessary since we're in the context of a single arg, not a string command
-                param_str = str(param_value)
-                # Replace all occurrences of $PARAM_NAME with the parameter value
-                substituted_arg = substituted_arg.replace(f"${param_name}", param_str)
-            substituted_args.append(substituted_arg)
-
-        return substituted_args
+        # The command template was tokenized when the action was created
+        command_args = action.command_tokens
+
+        if action.parameter_pattern is None:
+            return list(command_args)
+
+        # Convert parameter values to strings for substitution
+        # Note: quoting is not necessary since we're in the context of a single arg, not a string command
+        values = {name: str(value) for name, value in env_vars.items()}
+
+        def replace(match: re.Match[str]) -> str:
+            # Leave placeholders for unset parameters (e.g. optional env vars) as-is
+            return values.get(match.group(1), match.group(0))
+
+        # Substitute all parameters in each argument in a single pass
+        return [action.parameter_pattern.sub(replace, arg) for arg in command_args]
 
     def _prepare_parameters(
         self, action: Action, provided_parameters: Dict[str, Any]
@@ -129,62 +259,58 @@ class CommandExecutor:
         """
         env_vars = {}
 
-        # Process each parameter defined in the action
-        for param in action.parameters:
-            # Handle required and optional environment variables
-            if param.type in [
-                ParameterType.REQUIRED_ENV_VAR,
-                ParameterType.OPTIONAL_ENV_VAR,
-            ]:
-                # These parameters are not provided by the client but should be in the environment
-                env_value = os.environ.get(param.name)
-                if env_value is not None:
-                    env_vars[param.name] = env_value
-                elif param.type == ParameterType.REQUIRED_ENV_VAR:
-                    raise ExecutionError(
-                        f"HooksMCP Error: Required environment variable '{param.name}' not set for action '{action.name}'"
-                    )
-                continue
-
-            # Handle project file paths
-            elif param.type == ParameterType.PROJECT_FILE_PATH:
-                # Get the value from provided parameters or use default
-                value = provided_parameters.get(param.name, param.default)
-
-                # If no value and no default, it's required
-                if value is None:
-                    raise ExecutionError(
-                        f"HooksMCP Error: Required parameter '{param.name}' not provided for action '{action.name}'"
-                    )
-
-                # Validate the path
-                if not validate_project_path(value, self.project_root):
-                    raise ExecutionError(
-                        f"HooksMCP Error: Invalid path '{value}' for parameter '{param.name}' in action '{action.name}'. "
-                        f"Path must be within project boundaries and not contain directory traversal sequences."
-                    )
-
-                # Check if file exists for project_file_path parameters
-                full_path = resolve_path(value, self.project_root)
-                if not full_path.exists():
-                    raise ExecutionError(
-                        f"HooksMCP Error: Path '{value}' for parameter '{param.name}' in action '{action.name}' does not exist"
-                    )
-
-                env_vars[param.name] = value
-
-            # Handle insecure strings
-            elif param.type == ParameterType.INSECURE_STRING:
-                # Get the value from provided parameters or use default
-                value = provided_parameters.get(param.name, param.default)
-
-                # If no value and no default, it's required
-                if value is None:
-                    raise ExecutionError(
-                        f"HooksMCP Error: Required parameter '{param.name}' not provided for action '{action.name}'"
-                    )
-
-                # Convert to string if needed
-                env_vars[param.name] = str(value)
+        # Required and optional environment variables are not provided by the
+        # client but should be in the environment
+        for param in action.env_parameters:
+            env_value = os.environ.get(param.name)
+            if env_value is not None:
+                env_vars[param.name] = env_value
+            elif param.type is ParameterType.REQUIRED_ENV_VAR:
+                raise ExecutionError(
+                    f"HooksMCP Error: Required environment variable '{param.name}' not set for action '{action.name}'"
+                )
+
+        # Handle project file paths
+        for param in action.path_parameters:
+            # Get the value from provided parameters or use default
+            value = provided_parameters.get(param.name, param.default)
+
+            # If no value and no default, it's required
+            if value is None:
+                raise ExecutionError(
+                    f"HooksMCP Error: Required parameter '{param.name}' not provided for action '{action.name}'"
+                )
+
+            # Validate the path
+            if not validate_project_path(
+                value, self._resolved_project_root, root_is_resolved=True
+            ):
+                raise ExecutionError(
+                    f"HooksMCP Error: Invalid path '{value}' for parameter '{param.name}' in action '{action.name}'. "
+                    f"Path must be within project boundaries and not contain directory traversal sequences."
+                )
+
+            # Check if file exists for project_file_path parameters. The path was
+            # just validated, so a single stat (following symlinks) is enough.
+            if not os.path.exists(os.path.join(self._resolved_project_root, value)):
+                raise ExecutionError(
+                    f"HooksMCP Error: Path '{value}' for parameter '{param.name}' in action '{action.name}' does not exist"
+                )
+
+            env_vars[param.name] = value
+
+        # Handle insecure strings
+        for param in action.string_parameters:
+            # Get the value from provided parameters or use default
+            value = provided_parameters.get(param.name, param.default)
+
+            # If no value and no default, it's required
+            if value is None:
+                raise ExecutionError(
+                    f"HooksMCP Error: Required parameter '{param.name}' not provided for action '{action.name}'"
+                )
+
+            # Convert to string if needed
+            env_vars[param.name] = str(value)
 
         return env_vars
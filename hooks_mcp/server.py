@@ -1,31 +1,36 @@
+from __future__ import annotations
+
 import argparse
+import asyncio
 import os
+import re
 import sys
 from pathlib import Path
-from typing import Any, Dict, List
-
-from mcp.server import Server
-from mcp.server.stdio import stdio_server
-from mcp.types import (
-    GetPromptResult,
-    Prompt,
-    PromptArgument,
-    PromptMessage,
-    TextContent,
-    Tool,
-)
+from typing import TYPE_CHECKING, Any, Dict, List
+
+# The mcp package is slow to import, so it is only loaded once the server
+# actually needs it. CLI paths like --help, --version and config errors skip it.
+if TYPE_CHECKING:
+    from mcp.types import GetPromptResult, Prompt, TextContent, Tool
 
 from .config import (
-    ActionParameter,
     ConfigError,
     HooksMCPConfig,
-    ParameterType,
 )
 from .config import (
     Prompt as ConfigPrompt,
 )
 from .executor import CommandExecutor, ExecutionError
 
+# Matches {{variable}} placeholders in prompt templates
+_TEMPLATE_VAR_RE = re.compile(r"\{\{([^{}]+)\}\}")
+
+# Capabilities advertised to clients, the same for every server instance
+_EXPERIMENTAL_CAPABILITIES: Dict[str, Dict[str, Any]] = {
+    "tools": {"listChanged": True},
+    "prompts": {"listChanged": True},
+}
+
 
 def create_prompt_definitions(config: HooksMCPConfig) -> List[Prompt]:
     """
@@ -37,6 +42,8 @@ def create_prompt_definitions(config: HooksMCPConfig) -> List[Prompt]:
     Returns:
         List of MCP Prompt definitions
     """
+    from mcp.types import Prompt, PromptArgument
+
     prompts = []
 
     for prompt in config.prompts:
@@ -73,82 +80,61 @@ def create_tool_definitions(
     Returns:
         List of MCP Tool definitions
     """
+    from mcp.types import Tool
+
     tools = []
 
     for action in config.actions:
-        # Convert action parameters to MCP tool parameters
-        parameters: List[ActionParameter] = []
-        for param in action.parameters:
-            # Skip required_env_var and optional_env_var as they're not provided by the client
-            if param.type in [
-                ParameterType.REQUIRED_ENV_VAR,
-                ParameterType.OPTIONAL_ENV_VAR,
-            ]:
-                continue
-
-            parameters.append(param)
-
         tool = Tool(
             name=action.name,
             description=action.description,
-            inputSchema={
-                "type": "object",
-                "properties": {
-                    param.name: {
-                        "type": "string",
-                        "description": param.description,
-                    }
-                    for param in parameters
-                },
-                "required": [
-                    param.name for param in parameters if param.default is None
-                ],
-            },
+            inputSchema=action.input_schema,
         )
         tools.append(tool)
 
-    # Add get_prompt tool if there are prompts and it should be exposed
-    if config.prompts and not disable_prompt_tool:
-        # Determine which prompts to expose based on get_prompt_tool_filter
-        exposed_prompts = config.prompts
-        if config.get_prompt_tool_filter is not None:
-            # If filter is empty, don't expose the tool at all
-            if not config.get_prompt_tool_filter:
-                return tools
-            # Otherwise, filter prompts by name
-            filter_set = set(config.get_prompt_tool_filter)
-            exposed_prompts = [p for p in config.prompts if p.name in filter_set]
-
-        # Only add the tool if there are prompts to expose
-        if exposed_prompts:
-            # Build tool description with list of prompts
-            prompt_list_desc = "\n".join(
-                [f"- {prompt.name}: {prompt.description}" for prompt in exposed_prompts]
-            )
-            tool_description = (
-                "Get a prompt designed for this codebase. The prompts include:\n"
-                f"{prompt_list_desc}"
-            )
+    # Only add the get_prompt tool if there are prompts and it should be exposed.
+    # An empty get_prompt_tool_filter also disables the tool.
+    if disable_prompt_tool or not config.prompts or config.get_prompt_tool_filter == []:
+        return tools
 
-            # Create enum of prompt names for the tool parameter
-            prompt_names = [prompt.name for prompt in exposed_prompts]
-
-            get_prompt_tool = Tool(
-                name="get_prompt",
-                description=tool_description,
-                inputSchema={
-                    "type": "object",
-                    "properties": {
-                        "prompt_name": {
-                            "type": "string",
-                            "description": "The name of the prompt to retrieve",
-                            "enum": prompt_names,
-                        }
-                    },
-                    "required": ["prompt_name"],
-                },
-            )
-            tools.append(get_prompt_tool)
+    # Determine which prompts to expose based on get_prompt_tool_filter
+    exposed_prompts = config.prompts
+    if config.get_prompt_tool_filter is not None:
+        filter_set = config.get_prompt_tool_filter_set
+        exposed_prompts = [p for p in config.prompts if p.name in filter_set]
+
+    # Only add the tool if there are prompts to expose
+    if not exposed_prompts:
+        return tools
+
+    # Build tool description with list of prompts
+    prompt_list_desc = "\n".join(
+        [f"- {prompt.name}: {prompt.description}" for prompt in exposed_prompts]
+    )
+    tool_description = (
+        "Get a prompt designed for this codebase. The prompts include:\n"
+        f"{prompt_list_desc}"
+    )
+
+    # Create enum of prompt names for the tool parameter
+    prompt_names = [prompt.name for prompt in exposed_prompts]
+
+    get_prompt_tool = Tool(
+        name="get_prompt",
+        description=tool_description,
+        inputSchema={
+            "type": "object",
+            "properties": {
+                "prompt_name": {
+                    "type": "string",
+                    "description": "The name of the prompt to retrieve",
+                    "enum": prompt_names,
+                }
+            },
+            "required": ["prompt_name"],
+        },
+    )
+    tools.append(get_prompt_tool)
 
     return tools
 
@@ -167,19 +153,38 @@ def get_prompt_content(config_prompt: ConfigPrompt, config_path: Path) -> str:
     if config_prompt.prompt_text:
         return config_prompt.prompt_text
     elif config_prompt.prompt_file:
-        prompt_file_path = config_path.parent / config_prompt.prompt_file
         try:
-            return prompt_file_path.read_text(encoding="utf-8")
+            return config_prompt.read_prompt_file(config_path.parent)
         except Exception as e:
             raise ExecutionError(
                 f"HooksMCP Error: Failed to read prompt file '{config_prompt.prompt_file}': {str(e)}"
-            )
+            ) from e
     else:
         raise ExecutionError(
             f"HooksMCP Error: Prompt '{config_prompt.name}' has no content"
         )
 
 
+def substitute_prompt_arguments(prompt_content: str, arguments: Dict[str, Any]) -> str:
+    """
+    Substitute {{variable}} templates in prompt content with argument values.
+
+    Args:
+        prompt_content: The prompt template
+        arguments: Argument values by name
+
+    Returns:
+        The prompt content with known variables replaced. Unknown variables are left as-is.
+    """
+
+    def replace(match: re.Match[str]) -> str:
+        name = match.group(1)
+        return str(arguments[name]) if name in arguments else match.group(0)
+
+    # One pass over the content, so substituted values are never scanned again
+    return _TEMPLATE_VAR_RE.sub(replace, prompt_content)
+
+
 async def serve(
     hooks_mcp_config: HooksMCPConfig,
     config_path: Path,
@@ -191,12 +196,22 @@ async def serve(
     Args:
         hooks_mcp_config: The HooksMCP configuration
     """
+    from mcp.server import Server
+    from mcp.server.stdio import stdio_server
+    from mcp.types import GetPromptResult, PromptMessage, TextContent
+
     # Create tool definitions
     tools = create_tool_definitions(hooks_mcp_config, disable_prompt_tool)
 
     # Create prompt definitions
     prompts = create_prompt_definitions(hooks_mcp_config)
 
+    # Index prompts by name for constant-time lookup. Like next() over the list,
+    # the first prompt wins if names are duplicated.
+    prompts_by_name: Dict[str, ConfigPrompt] = {}
+    for config_prompt in hooks_mcp_config.prompts:
+        prompts_by_name.setdefault(config_prompt.name, config_prompt)
+
     # Create command executor
     executor = CommandExecutor()
 
@@ -226,7 +241,7 @@ async def serve(
                         "HooksMCP Error: No prompts are available through get_prompt tool"
                     )
                 # Otherwise, check if prompt is in the filter list
-                if prompt_name not in hooks_mcp_config.get_prompt_tool_filter:
+                if prompt_name not in hooks_mcp_config.get_prompt_tool_filter_set:
                     available_prompts = ", ".join(
                         hooks_mcp_config.get_prompt_tool_filter
                     )
@@ -236,9 +251,7 @@ async def serve(
                     )
 
             # Find the prompt by name
-            config_prompt = next(
-                (p for p in hooks_mcp_config.prompts if p.name == prompt_name), None
-            )
+            config_prompt = prompts_by_name.get(prompt_name)
             if not config_prompt:
                 raise ExecutionError(
                     f"HooksMCP Error: Prompt '{prompt_name}' not found"
@@ -251,29 +264,32 @@ async def serve(
             return [TextContent(type="text", text=prompt_content)]
 
         # Find the action by name
-        action = next((a for a in hooks_mcp_config.actions if a.name == name), None)
+        action = hooks_mcp_config.actions_by_name.get(name)
         if not action:
             raise ExecutionError(f"HooksMCP Error: Action '{name}' not found")
 
         try:
-            # Execute the action
-            result = executor.execute_action(action, arguments)
-
-            # Format the result
-            output = f"Command executed: {action.command}\n"
-            output += f"Exit code: {result['status_code']}\n"
+            # Execute the action in a worker thread, so a long running command
+            # doesn't block the event loop and other requests can be served
+            result = await asyncio.to_thread(executor.execute_action, action, arguments)
+
+            # Format the result, joining once rather than concatenating large output
+            parts = [
+                f"Command executed: {action.command}\n",
+                f"Exit code: {result['status_code']}\n",
+            ]
             if result["stdout"]:
-                output += f"STDOUT:\n{result['stdout']}\n"
+                parts.append(f"STDOUT:\n{result['stdout']}\n")
             if result["stderr"]:
-                output += f"STDERR:\n{result['stderr']}\n"
+                parts.append(f"STDERR:\n{result['stderr']}\n")
 
-            return [TextContent(type="text", text=output)]
+            return [TextContent(type="text", text="".join(parts))]
         except ExecutionError:
             raise
         except Exception as e:
             raise ExecutionError(
                 f"HooksMCP Error: Unexpected error executing action '{name}': {str(e)}"
-            )
+            ) from e
 
     # Register prompts if any exist
     if prompts:
@@ -287,9 +303,7 @@ async def serve(
             name: str, arguments: Dict[str, Any] | None = None
         ) -> GetPromptResult:
             # Find the prompt by name
-            config_prompt = next(
-                (p for p in hooks_mcp_config.prompts if p.name == name), None
-            )
+            config_prompt = prompts_by_name.get(name)
             if not config_prompt:
                 raise ExecutionError(f"HooksMCP Error: Prompt '{name}' not found")
 
@@ -298,12 +312,7 @@ async def serve(
 
             # Substitute arguments if provided
             if arguments:
-                # Use simple string replacement for {{variable}} templates
-                for arg_name, arg_value in arguments.items():
-                    template_var = f"{{{{{arg_name}}}}}"
-                    prompt_content = prompt_content.replace(
-                        template_var, str(arg_value)
-                    )
+                prompt_content = substitute_prompt_arguments(prompt_content, arguments)
 
             # Return as GetPromptResult
             return GetPromptResult(
@@ -318,10 +327,7 @@ async def serve(
 
     # Set up server capabilities
     server_capabilities = server.create_initialization_options(
-        experimental_capabilities={
-            "tools": {"listChanged": True},
-            "prompts": {"listChanged": True},
-        }
+        experimental_capabilities=_EXPERIMENTAL_CAPABILITIES
     )
 
     # Run the server
@@ -333,12 +339,12 @@ async def serve(
 
 def get_version() -> str:
     """Get the version of the hooks-mcp package."""
-    try:
-        # Try to get version from installed package metadata
-        from importlib.metadata import version as get_version
+    from importlib.metadata import PackageNotFoundError, version
 
-        return f"hooks-mcp {get_version('hooks-mcp')}"
-    except Exception:
+    try:
+        # Read the version from installed package metadata
+        return f"hooks-mcp {version('hooks-mcp')}"
+    except PackageNotFoundError:
         return "hooks-mcp: cannot load version"
 
 
@@ -384,12 +390,9 @@ def main() -> None:
             )
             sys.exit(1)
 
-    # Load configuration
+    # Load configuration. A missing file is reported by from_yaml, which stats the
+    # file anyway, so it isn't checked separately here.
     config_path = Path(args.config_path)
-    if not config_path.exists():
-        print(f"HooksMCP Error: Configuration file '{config_path}' not found")
-        sys.exit(1)
-
     try:
         config = HooksMCPConfig.from_yaml(str(config_path))
     except ConfigError as e:
@@ -414,8 +417,6 @@ def main() -> None:
 
     # Run the server
     try:
-        import asyncio
-
         asyncio.run(serve(config, config_path, args.disable_prompt_tool))
     except KeyboardInterrupt:
         print("HooksMCP server stopped by user")
@@ -1,7 +1,22 @@
+import errno
 import os
 import re
 from pathlib import Path
 
+# Regular expression to match ANSI escape codes
+_ANSI_PATTERN = r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])"
+_ANSI_RE = re.compile(_ANSI_PATTERN)
+
+# Matches everything a terminal would hide: the start of a line up to its last
+# carriage return (overwritten by what follows), or any ANSI escape code.
+_TERMINAL_CONTROL_RE = re.compile(r"^[^\n]*\r|" + _ANSI_PATTERN, re.MULTILINE)
+
+# Windows error for a path that can't be resolved, e.g. because of a symlink loop
+_ERROR_CANT_RESOLVE_FILENAME = 1921
+
+# Environment variable references ($VAR or ${VAR}) left unexpanded in a path
+_UNEXPANDED_ENV_VAR_RE = re.compile(r"\$[A-Za-z_][A-Za-z0-9_]*|\$\{[^}]*\}")
+
 
 def strip_ansi_codes(text: str) -> str:
     """
@@ -13,9 +28,10 @@ def strip_ansi_codes(text: str) -> str:
     Returns:
         Text with ANSI escape codes removed
     """
-    # Regular expression to match ANSI escape codes
-    ansi_escape = re.compile(r"\x1B(?:[@-Z\\-_]|\[[0-?]*[ -/]*[@-~])")
-    return ansi_escape.sub("", text)
+    # Every escape code starts with ESC, so plain output can skip the regex
+    if "\x1b" not in text:
+        return text
+    return _ANSI_RE.sub("", text)
 
 
 def process_terminal_output(text: str) -> str:
@@ -29,42 +45,21 @@ def process_terminal_output(text: str) -> str:
     Returns:
         Processed text that represents the final visible state
     """
-    # Strip ANSI codes first
-    clean_text = strip_ansi_codes(text)
+    # Most output has no control characters, and these checks are quick C-level scans
+    if "\x1b" not in text and "\r" not in text:
+        return text.strip()
 
-    # Handle carriage returns - they overwrite the current line
-    lines = clean_text.split("\n")
-    processed_lines = []
+    # Windows line endings are plain newlines, not overwrites
+    if "\r\n" in text:
+        text = text.replace("\r\n", "\n")
 
-    for line in lines:
-        # Split by carriage return and keep only the last part (final state)
-        parts = line.split("\r")
-        if parts:
-            # The last part is what would be visible after all carriage returns
-            processed_lines.append(parts[-1])
-        else:
-            processed_lines.append("")
+    # Strip ANSI codes and overwritten line content in a single pass
+    return _TERMINAL_CONTROL_RE.sub("", text).strip()
 
-    return "\n".join(processed_lines).strip()
 
-
-def resolve_path(path: str, project_root: Path) -> Path:
-    """
-    Resolve a path to its canonical form.
-    """
-    # Convert to Path object
-    untrusted_path = Path(path)
-
-    # If the path is absolute, resolve it directly
-    if untrusted_path.is_absolute():
-        return untrusted_path.resolve()
-    else:
-        # If the path is relative, resolve it relative to the project root
-        # This is crucial for security - we want relative paths to be relative to project root
-        return (project_root / untrusted_path).resolve()
-
-
-def validate_project_path(path: str, project_root: Path) -> bool:
+def validate_project_path(
+    path: str, project_root: Path, root_is_resolved: bool = False
+) -> bool:
     """
     Validate that a path is within the project boundaries and doesn't
     attempt to break out using directory traversal or any other method.
@@ -81,11 +76,12 @@ def validate_project_path(path: str, project_root: Path) -> bool:
     1. Fully expand and resolve both paths to their canonical forms
     2. This includes expanding ~ (user home), environment variables, and symlinks
     3. Then check if the fully resolved untrusted path is within project boundaries
-    4. Use pathlib for cross-platform compatibility
+    4. Compare the canonical paths as strings, avoiding pathlib object overhead
 
     Args:
         path: Path to validate (untrusted input)
         project_root: Project root directory (trusted)
+        root_is_resolved: Set when project_root is already canonical, to skip re-resolving it
 
     Returns:
         True if path is valid and within project boundaries, False otherwise
@@ -94,33 +90,49 @@ def validate_project_path(path: str, project_root: Path) -> bool:
     try:
         # Resolve the trusted project root to canonical absolute path
         # This handles symlinks, normalizes the path, and makes it absolute
-        canonical_project_root = project_root.resolve()
+        canonical_project_root = (
+            os.fspath(project_root)
+            if root_is_resolved
+            else os.path.realpath(project_root)
+        )
 
         # For the untrusted path, we MUST fully expand everything to see where it really points
-        # Expand user home directory (~)
-        expanded_path = os.path.expanduser(path)
-        # Expand environment variables ($HOME, ${VAR}, etc.)
-        expanded_path = os.path.expandvars(expanded_path)
-
-        # Security check: If path still contains unexpanded environment variables,
-        # reject it to prevent treating them as relative paths within the project
-        # Look for patterns like $VAR or ${VAR} that indicate unexpanded variables
-        if re.search(r"\$[A-Za-z_][A-Za-z0-9_]*|\$\{[^}]*\}", expanded_path):
-            return False
-
-        # Convert to respoved path
-        candidate_path = resolve_path(expanded_path, canonical_project_root)
-
-        # Use is_relative_to() if available (Python 3.9+), otherwise use relative_to()
-        if hasattr(candidate_path, "is_relative_to"):
-            return candidate_path.is_relative_to(canonical_project_root)
-        else:
-            try:
-                candidate_path.relative_to(canonical_project_root)
-                return True
-            except ValueError:
+        # Expand user home directory (~), which only applies to a leading ~
+        expanded_path = os.path.expanduser(path) if path.startswith("~") else path
+        # Every variable reference starts with $, so most paths skip both steps below
+        if "$" in expanded_path:
+            # Expand environment variables ($HOME, ${VAR}, etc.)
+            expanded_path = os.path.expandvars(expanded_path)
+
+            # Security check: If path still contains unexpanded environment variables,
+            # reject it to prevent treating them as relative paths within the project
+            # Look for patterns like $VAR or ${VAR} that indicate unexpanded variables
+            if _UNEXPANDED_ENV_VAR_RE.search(expanded_path):
                 return False
 
+        # Resolve relative to the project root (absolute paths are kept as-is by join)
+        candidate_path = os.path.realpath(
+            os.path.join(canonical_project_root, expanded_path)
+        )
+
+        # Non-strict resolution leaves a symlink loop unresolved instead of raising,
+        # so stat the result to detect one, as Path.resolve() does
+        try:
+            os.stat(candidate_path)
+        except OSError as e:
+            if (
+                e.errno == errno.ELOOP
+                or getattr(e, "winerror", None) == _ERROR_CANT_RESOLVE_FILENAME
+            ):
+                return False
+
+        # Both paths are canonical, so containment is a prefix check on whole components
+        candidate_path = os.path.normcase(candidate_path)
+        canonical_project_root = os.path.normcase(canonical_project_root)
+        return candidate_path == canonical_project_root or candidate_path.startswith(
+            canonical_project_root.rstrip(os.sep) + os.sep
+        )
+
     except (OSError, ValueError, RuntimeError):
         # Any error during path resolution should result in rejection
         # This catches issues like:
@@ -2,8 +2,17 @@ import tempfile
 from pathlib import Path
 
 import pytest
+import yaml
 
-from hooks_mcp.config import ConfigError, HooksMCPConfig
+from hooks_mcp.config import (
+    Action,
+    ActionParameter,
+    ConfigError,
+    HooksMCPConfig,
+    ParameterType,
+    Prompt,
+    PromptArgument,
+)
 
 
 class TestConfig:
@@ -156,7 +165,25 @@ server_name: "MyProjectTools"
 server_description: "Development tools for MyProject"
 """
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
+        config = HooksMCPConfig.from_yaml_string(yaml_content)
+
+        assert config.server_name == "MyProjectTools"
+        assert config.server_description == "Development tools for MyProject"
+        assert len(config.actions) == 0
+
+    def test_valid_config_utf8_content(self):
+        """Test that non-ASCII UTF-8 content is decoded correctly."""
+        yaml_content = """
+server_description: "Outils de développement ✓"
+actions:
+  - name: "test"
+    description: "Exécuter les tests"
+    command: "echo héllo"
+"""
+
+        with tempfile.NamedTemporaryFile(
+            mode="w", suffix=".yaml", delete=False, encoding="utf-8"
+        ) as f:
             f.write(yaml_content)
             f.flush()
 
@@ -165,9 +192,9 @@ server_description: "Development tools for MyProject"
             # Clean up
             Path(f.name).unlink()
 
-        assert config.server_name == "MyProjectTools"
-        assert config.server_description == "Development tools for MyProject"
-        assert len(config.actions) == 0
+        assert config.server_description == "Outils de développement ✓"
+        assert config.actions[0].description == "Exécuter les tests"
+        assert config.actions[0].command == "echo héllo"
 
     def test_invalid_config_invalid_parameter_type(self):
         """Test that config with invalid parameter type raises an error."""
@@ -182,15 +209,8 @@ actions:
         description: "Path to test file"
 """
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            f.write(yaml_content)
-            f.flush()
-
-            with pytest.raises(ConfigError) as context:
-                HooksMCPConfig.from_yaml(f.name)
-
-            # Clean up
-            Path(f.name).unlink()
+        with pytest.raises(ConfigError) as context:
+            HooksMCPConfig.from_yaml_string(yaml_content)
 
         assert "Invalid parameter type" in str(context.value)
         assert "invalid_type" in str(context.value)
@@ -203,15 +223,8 @@ actions:
     command: "python -m pytest"
 """
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            f.write(yaml_content)
-            f.flush()
-
-            with pytest.raises(ConfigError) as context:
-                HooksMCPConfig.from_yaml(f.name)
-
-            # Clean up
-            Path(f.name).unlink()
+        with pytest.raises(ConfigError) as context:
+            HooksMCPConfig.from_yaml_string(yaml_content)
 
         assert "'name' is required" in str(context.value)
 
@@ -232,14 +245,7 @@ actions:
         description: "Optional variable"
 """
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            f.write(yaml_content)
-            f.flush()
-
-            config = HooksMCPConfig.from_yaml(f.name)
-
-            # Clean up
-            Path(f.name).unlink()
+        config = HooksMCPConfig.from_yaml_string(yaml_content)
 
         # Initially, no env vars are set, so API_KEY should be missing
         missing_vars = config.validate_required_env_vars()
@@ -257,6 +263,33 @@ actions:
         # Clean up
         del os.environ["API_KEY"]
 
+    def test_config_validate_required_env_vars_shared(self, monkeypatch):
+        """Test that a required env var used by several actions is reported once."""
+        monkeypatch.delenv("SHARED_KEY", raising=False)
+        monkeypatch.setenv("EMPTY_KEY", "")
+        yaml_content = """
+actions:
+  - name: "first"
+    description: "First action"
+    command: "echo 1"
+    parameters:
+      - name: "SHARED_KEY"
+        type: "required_env_var"
+      - name: "EMPTY_KEY"
+        type: "required_env_var"
+  - name: "second"
+    description: "Second action"
+    command: "echo 2"
+    parameters:
+      - name: "SHARED_KEY"
+        type: "required_env_var"
+"""
+
+        config = HooksMCPConfig.from_yaml_string(yaml_content)
+
+        # Empty values count as missing
+        assert config.validate_required_env_vars() == ["EMPTY_KEY", "SHARED_KEY"]
+
     def test_config_with_timeout(self):
         """Test parsing a configuration with timeout parameter."""
         yaml_content = """
@@ -271,14 +304,7 @@ actions:
     command: "echo Hello"
 """
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            f.write(yaml_content)
-            f.flush()
-
-            config = HooksMCPConfig.from_yaml(f.name)
-
-            # Clean up
-            Path(f.name).unlink()
+        config = HooksMCPConfig.from_yaml_string(yaml_content)
 
         assert len(config.actions) == 2
 
@@ -438,15 +464,8 @@ prompts:
     prompt: "Some prompt content"
 """
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            f.write(yaml_content)
-            f.flush()
-
-            with pytest.raises(ConfigError) as context:
-                HooksMCPConfig.from_yaml(f.name)
-
-            # Clean up
-            Path(f.name).unlink()
+        with pytest.raises(ConfigError) as context:
+            HooksMCPConfig.from_yaml_string(yaml_content)
 
         assert "'name' is required for each prompt" in str(context.value)
 
@@ -463,15 +482,8 @@ prompts:
     description: "A prompt with no content"
 """
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            f.write(yaml_content)
-            f.flush()
-
-            with pytest.raises(ConfigError) as context:
-                HooksMCPConfig.from_yaml(f.name)
-
-            # Clean up
-            Path(f.name).unlink()
+        with pytest.raises(ConfigError) as context:
+            HooksMCPConfig.from_yaml_string(yaml_content)
 
         assert "must specify either 'prompt' or 'prompt-file'" in str(context.value)
 
@@ -490,15 +502,8 @@ prompts:
     prompt-file: "./some_file.md"
 """
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            f.write(yaml_content)
-            f.flush()
-
-            with pytest.raises(ConfigError) as context:
-                HooksMCPConfig.from_yaml(f.name)
-
-            # Clean up
-            Path(f.name).unlink()
+        with pytest.raises(ConfigError) as context:
+            HooksMCPConfig.from_yaml_string(yaml_content)
 
         assert "cannot specify both 'prompt' and 'prompt-file'" in str(context.value)
 
@@ -517,15 +522,8 @@ prompts:
     prompt: "Some prompt content"
 """
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            f.write(yaml_content)
-            f.flush()
-
-            with pytest.raises(ConfigError) as context:
-                HooksMCPConfig.from_yaml(f.name)
-
-            # Clean up
-            Path(f.name).unlink()
+        with pytest.raises(ConfigError) as context:
+            HooksMCPConfig.from_yaml_string(yaml_content)
 
         assert "exceeds 32 character limit" in str(context.value)
 
@@ -544,15 +542,8 @@ prompts:
     prompt: "Some prompt content"
 """
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            f.write(yaml_content)
-            f.flush()
-
-            with pytest.raises(ConfigError) as context:
-                HooksMCPConfig.from_yaml(f.name)
-
-            # Clean up
-            Path(f.name).unlink()
+        with pytest.raises(ConfigError) as context:
+            HooksMCPConfig.from_yaml_string(yaml_content)
 
         assert "exceeds 256 character limit" in str(context.value)
 
@@ -570,15 +561,8 @@ prompts:
     prompt-file: "./non_existent_file.md"
 """
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            f.write(yaml_content)
-            f.flush()
-
-            with pytest.raises(ConfigError) as context:
-                HooksMCPConfig.from_yaml(f.name)
-
-            # Clean up
-            Path(f.name).unlink()
+        with pytest.raises(ConfigError) as context:
+            HooksMCPConfig.from_yaml_string(yaml_content)
 
         assert (
             "Prompt file './non_existent_file.md' for prompt 'missing_file_prompt' not found"
@@ -602,15 +586,8 @@ prompts:
         required: true
 """
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            f.write(yaml_content)
-            f.flush()
-
-            with pytest.raises(ConfigError) as context:
-                HooksMCPConfig.from_yaml(f.name)
-
-            # Clean up
-            Path(f.name).unlink()
+        with pytest.raises(ConfigError) as context:
+            HooksMCPConfig.from_yaml_string(yaml_content)
 
         assert "'name' is required for each prompt argument" in str(context.value)
 
@@ -635,14 +612,7 @@ get_prompt_tool_filter:
   - "prompt1"
 """
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            f.write(yaml_content)
-            f.flush()
-
-            config = HooksMCPConfig.from_yaml(f.name)
-
-            # Clean up
-            Path(f.name).unlink()
+        config = HooksMCPConfig.from_yaml_string(yaml_content)
 
         assert len(config.prompts) == 2
         assert config.get_prompt_tool_filter == ["prompt1"]
@@ -664,18 +634,29 @@ get_prompt_tool_filter:
   - "nonexistent_prompt"
 """
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            f.write(yaml_content)
-            f.flush()
+        with pytest.raises(ConfigError) as context:
+            HooksMCPConfig.from_yaml_string(yaml_content)
+
+        assert (
+            "Prompt 'nonexistent_prompt' in get_prompt_tool_filter not found in prompts list"
+            in str(context.value)
+        )
 
-            with pytest.raises(ConfigError) as context:
-                HooksMCPConfig.from_yaml(f.name)
+    def test_invalid_config_get_prompt_tool_filter_reports_all_invalid_names(self):
+        """Test that every invalid name in get_prompt_tool_filter is reported."""
+        prompt = Prompt(
+            name="prompt1", description="First prompt", prompt_text="Content"
+        )
 
-            # Clean up
-            Path(f.name).unlink()
+        with pytest.raises(ConfigError) as context:
+            HooksMCPConfig(
+                actions=[],
+                prompts=[prompt],
+                get_prompt_tool_filter=["missing1", "prompt1", "missing2"],
+            )
 
         assert (
-            "Prompt 'nonexistent_prompt' in get_prompt_tool_filter not found in prompts list"
+            "Prompts 'missing1', 'missing2' in get_prompt_tool_filter not found in prompts list"
             in str(context.value)
         )
 
@@ -695,14 +676,7 @@ prompts:
 get_prompt_tool_filter: []
 """
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            f.write(yaml_content)
-            f.flush()
-
-            config = HooksMCPConfig.from_yaml(f.name)
-
-            # Clean up
-            Path(f.name).unlink()
+        config = HooksMCPConfig.from_yaml_string(yaml_content)
 
         assert len(config.prompts) == 1
         assert config.get_prompt_tool_filter == []
@@ -724,14 +698,7 @@ prompts:
         required: true
 """
 
-        with tempfile.NamedTemporaryFile(mode="w", suffix=".yaml", delete=False) as f:
-            f.write(yaml_content)
-            f.flush()
-
-            config = HooksMCPConfig.from_yaml(f.name)
-
-            # Clean up
-            Path(f.name).unlink()
+        config = HooksMCPConfig.from_yaml_string(yaml_content)
 
         assert config.server_name == "HooksMCP"
         assert (
@@ -765,3 +732,208 @@ prompts:
         assert arg1.name == "CODE_SNIPPET"
         assert arg1.description == "The code to generate tests for"
         assert arg1.required
+
+    def test_actions_by_name(self):
+        """Test that actions are indexed by name, keeping the first duplicate."""
+        first = Action(name="test", description="First", command="echo 1")
+        second = Action(name="lint", description="Second", command="echo 2")
+        duplicate = Action(name="test", description="Duplicate", command="echo 3")
+
+        config = HooksMCPConfig(actions=[first, second, duplicate])
+
+        assert config.actions_by_name == {"test": first, "lint": second}
+
+    def test_from_yaml_caches_unchanged_file(self, tmp_path):
+        """Test that loading an unchanged file reuses the parsed config."""
+        config_path = tmp_path / "hooks_mcp.yaml"
+        config_path.write_text(
+            """
+actions:
+  - name: "test"
+    description: "Run tests"
+    command: "python -m pytest"
+"""
+        )
+
+        config = HooksMCPConfig.from_yaml(str(config_path))
+        assert HooksMCPConfig.from_yaml(str(config_path)) is config
+
+        # Editing the file invalidates the cache
+        config_path.write_text(
+            """
+actions:
+  - name: "lint"
+    description: "Lint the code"
+    command: "ruff check"
+"""
+        )
+
+        reloaded = HooksMCPConfig.from_yaml(str(config_path))
+        assert reloaded is not config
+        assert reloaded.actions[0].name == "lint"
+
+    def test_invalid_yaml_chains_original_error(self, tmp_path):
+        """Test that YAML parse errors keep the original exception as the cause."""
+        config_path = tmp_path / "hooks_mcp.yaml"
+        config_path.write_text("actions: [unclosed\n")
+
+        with pytest.raises(ConfigError) as context:
+            HooksMCPConfig.from_yaml(str(config_path))
+
+        assert "Failed to parse YAML file" in str(context.value)
+        assert isinstance(context.value.__cause__, yaml.YAMLError)
+
+    def test_config_classes_use_slots(self):
+        """Test that prompt and config objects don't carry a per-instance __dict__."""
+        argument = PromptArgument("CODE", "Code to review")
+        prompt = Prompt(
+            name="review",
+            description="Review code",
+            prompt_text="Review {{CODE}}",
+            arguments=[argument],
+        )
+        config = HooksMCPConfig(actions=[], prompts=[prompt])
+
+        for obj in (argument, prompt, config):
+            assert not hasattr(obj, "__dict__")
+
+    def test_get_prompt_tool_filter_set(self):
+        """Test that the prompt filter is also available as a frozenset."""
+        prompts = [
+            Prompt(name=name, description="Prompt", prompt_text="Content")
+            for name in ("prompt1", "prompt2")
+        ]
+
+        config = HooksMCPConfig(
+            actions=[], prompts=prompts, get_prompt_tool_filter=["prompt1"]
+        )
+        assert config.get_prompt_tool_filter_set == frozenset({"prompt1"})
+
+        config = HooksMCPConfig(actions=[], prompts=prompts)
+        assert config.get_prompt_tool_filter is None
+        assert config.get_prompt_tool_filter_set == frozenset()
+
+    def test_from_yaml_string_prompt_file_relative_to_config_dir(self, tmp_path):
+        """Test that prompt files are resolved relative to config_dir."""
+        (tmp_path / "guide.md").write_text("Guide content")
+        yaml_content = """
+prompts:
+  - name: "guide"
+    description: "A guide"
+    prompt-file: "guide.md"
+"""
+
+        config = HooksMCPConfig.from_yaml_string(yaml_content, config_dir=str(tmp_path))
+
+        assert config.prompts[0].prompt_file == "guide.md"
+        assert config.prompts[0].read_prompt_file(tmp_path) == "Guide content"
+
+        # The default config_dir is the current directory, where guide.md doesn't exist
+        with pytest.raises(ConfigError) as context:
+            HooksMCPConfig.from_yaml_string(yaml_content)
+
+        assert "Prompt file 'guide.md' for prompt 'guide' not found" in str(
+            context.value
+        )
+
+    def test_from_yaml_string_invalid_yaml(self):
+        """Test that invalid YAML strings raise a ConfigError."""
+        with pytest.raises(ConfigError) as context:
+            HooksMCPConfig.from_yaml_string("actions: [unclosed\n")
+
+        assert "Failed to parse YAML" in str(context.value)
+        assert isinstance(context.value.__cause__, yaml.YAMLError)
+
+    def test_action_and_parameter_use_slots(self):
+        """Test that Action and ActionParameter don't carry a per-instance __dict__."""
+        param = ActionParameter("MESSAGE", ParameterType.INSECURE_STRING)
+        action = Action(
+            name="echo", description="Echo", command="echo $MESSAGE", parameters=[param]
+        )
+
+        assert not hasattr(param, "__dict__")
+        assert not hasattr(action, "__dict__")
+        with pytest.raises(AttributeError):
+            action.unknown_attribute = True  # type: ignore[attr-defined]
+
+    def test_parameter_type_is_normalized_to_enum(self):
+        """Test that string parameter types are converted to ParameterType members."""
+        param = ActionParameter("MESSAGE", "insecure_string")
+
+        assert param.type is ParameterType.INSECURE_STRING
+        assert param.type == "insecure_string"
+        assert str(param.type) == "insecure_string"
+        assert param.to_dict()["type"] == "insecure_string"
+
+        with pytest.raises(ValueError):
+            ActionParameter("MESSAGE", "invalid_type")
+
+    def test_action_invalid_command_syntax(self):
+        """Test that a command with invalid shell syntax is rejected up front."""
+        with pytest.raises(ConfigError) as context:
+            Action(
+                name="bad_quotes",
+                description="Unclosed quote",
+                command='echo "unclosed',
+            )
+
+        assert "Invalid command syntax for action 'bad_quotes'" in str(context.value)
+
+    def test_action_command_tokens(self):
+        """Test that the command template is tokenized when the action is created."""
+        action = Action(
+            name="echo",
+            description="Echo a message",
+            command="echo 'hello world' $MESSAGE",
+        )
+
+        assert action.command_tokens == ("echo", "hello world", "$MESSAGE")
+
+    def test_action_partitions_parameters_by_type(self):
+        """Test that parameters are grouped by type when the action is created."""
+        action = Action(
+            name="mixed",
+            description="Mixed parameters",
+            command="echo $FILE $MESSAGE",
+            parameters=[
+                ActionParameter("FILE", ParameterType.PROJECT_FILE_PATH),
+                ActionParameter("API_KEY", ParameterType.REQUIRED_ENV_VAR),
+                ActionParameter("MESSAGE", ParameterType.INSECURE_STRING),
+                ActionParameter("VERBOSE", ParameterType.OPTIONAL_ENV_VAR),
+            ],
+        )
+
+        assert [p.name for p in action.path_parameters] == ["FILE"]
+        assert [p.name for p in action.string_parameters] == ["MESSAGE"]
+        assert [p.name for p in action.env_parameters] == ["API_KEY", "VERBOSE"]
+        assert action.required_env_var_names == ("API_KEY",)
+
+    def test_parameter_pattern_only_includes_referenced_parameters(self):
+        """Test that only parameters used in the command are substituted."""
+        action = Action(
+            name="env_only",
+            description="Parameters consumed only as env vars",
+            command="echo Hello",
+            parameters=[
+                ActionParameter(
+                    "API_KEY", ParameterType.OPTIONAL_ENV_VAR, "Key used by child"
+                )
+            ],
+        )
+        assert action.parameter_pattern is None
+
+        action = Action(
+            name="mixed",
+            description="Mixed parameters",
+            command="echo $MESSAGE",
+            parameters=[
+                ActionParameter(
+                    "API_KEY", ParameterType.OPTIONAL_ENV_VAR, "Key used by child"
+                ),
+                ActionParameter(
+                    "MESSAGE", ParameterType.INSECURE_STRING, "Message to echo"
+                ),
+            ],
+        )
+        assert action.parameter_pattern is not None
+        assert action.parameter_pattern.pattern == r"\$(MESSAGE)"
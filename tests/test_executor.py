@@ -1,5 +1,4 @@
-import tempfile
-from pathlib import Path
+import subprocess
 
 import pytest
 
@@ -11,11 +10,10 @@ class TestExecutor:
     """Test command execution functionality."""
 
     @pytest.fixture(autouse=True)
-    def setup_teardown(self):
+    def setup_teardown(self, tmp_path):
         """Set up and tear down test environment."""
-        # Create a temporary directory for testing
-        self.temp_dir = tempfile.TemporaryDirectory()
-        self.project_root = Path(self.temp_dir.name)
+        # Use pytest's temporary directory, which is cleaned up automatically
+        self.project_root = tmp_path
 
         # Create some test files and directories
         (self.project_root / "tests").mkdir()
@@ -29,9 +27,6 @@ class TestExecutor:
         # This will run after each test
         yield
 
-        # Clean up test environment
-        self.temp_dir.cleanup()
-
     def test_execute_simple_command(self):
         """Test executing a simple command without parameters."""
         action = Action(
@@ -157,113 +152,42 @@ class TestExecutor:
 
         assert "Invalid run_path" in str(context.value)
 
-    def test_execute_command_with_insecure_string_prevents_command_injection(self):
-        """Test that insecure string parameters don't allow command injection."""
-        action = Action(
-            name="echo_insecure",
-            description="Echo insecure string",
-            command="echo $MESSAGE",
-            parameters=[
-                ActionParameter(
-                    "MESSAGE", ParameterType.INSECURE_STRING, "Message to echo"
-                )
-            ],
-        )
-
-        # This test checks that the command doesn't execute the second part of the string as a separate command
-        # If vulnerable to injection, this would execute both "echo 123" and "echo 456"
-        result = self.executor.execute_action(action, {"MESSAGE": "123 && echo 456"})
-
-        assert result["status_code"] == 0
-        # The output should contain the full string "123 && echo 456" and not just "123"
-        # It should not contain "456" on a separate line
-        assert "123 && echo 456" in result["stdout"]
-        assert "456" not in result["stdout"].split("\n")
-
-    def test_execute_command_with_insecure_string_prevents_semicolon_injection(self):
-        """Test that insecure string parameters don't allow semicolon command injection."""
-        action = Action(
-            name="echo_insecure",
-            description="Echo insecure string",
-            command="echo $MESSAGE",
-            parameters=[
-                ActionParameter(
-                    "MESSAGE", ParameterType.INSECURE_STRING, "Message to echo"
-                )
-            ],
-        )
-
-        # Test semicolon command injection
-        result = self.executor.execute_action(action, {"MESSAGE": "123; echo 456"})
-
-        assert result["status_code"] == 0
-        # The output should contain the full string "123; echo 456" and not just "123"
-        # It should not contain "456" on a separate line
-        assert "123; echo 456" in result["stdout"]
-        assert "456" not in result["stdout"].split("\n")
-
-    def test_execute_command_with_insecure_string_prevents_pipe_injection(self):
-        """Test that insecure string parameters don't allow pipe command injection."""
-        action = Action(
-            name="echo_insecure",
-            description="Echo insecure string",
-            command="echo $MESSAGE",
-            parameters=[
-                ActionParameter(
-                    "MESSAGE", ParameterType.INSECURE_STRING, "Message to echo"
-                )
-            ],
-        )
-
-        # Test pipe command injection
-        result = self.executor.execute_action(action, {"MESSAGE": "123 | echo 456"})
-
-        assert result["status_code"] == 0
-        # The output should contain the full string "123 | echo 456"
-        assert "123 | echo 456" in result["stdout"]
-
-    def test_execute_command_with_insecure_string_prevents_redirect_injection(self):
-        """Test that insecure string parameters don't allow redirect command injection."""
+    def test_execute_command_run_path_revalidated(self, tmp_path_factory):
+        """Test that a run_path replaced by a symlink out of the project is rejected."""
+        (self.project_root / "subdir").mkdir()
         action = Action(
-            name="echo_insecure",
-            description="Echo insecure string",
-            command="echo $MESSAGE",
-            parameters=[
-                ActionParameter(
-                    "MESSAGE", ParameterType.INSECURE_STRING, "Message to echo"
-                )
-            ],
+            name="pwd_test",
+            description="Print working directory",
+            command="pwd",
+            run_path="subdir",
         )
 
-        # Test redirect command injection
-        result = self.executor.execute_action(action, {"MESSAGE": "123 > test.txt"})
-
+        result = self.executor.execute_action(action, {})
         assert result["status_code"] == 0
-        # The output should contain the full string "123 > test.txt"
-        assert "123 > test.txt" in result["stdout"]
 
-    def test_execute_command_with_insecure_string_prevents_subshell_injection(self):
-        """Test that insecure string parameters don't allow subshell command injection."""
-        action = Action(
-            name="echo_insecure",
-            description="Echo insecure string",
-            command="echo $MESSAGE",
-            parameters=[
-                ActionParameter(
-                    "MESSAGE", ParameterType.INSECURE_STRING, "Message to echo"
-                )
-            ],
-        )
-
-        # Test subshell command injection
-        result = self.executor.execute_action(action, {"MESSAGE": "123 $(echo 456)"})
+        # Swap the directory for a symlink pointing outside the project
+        (self.project_root / "subdir").rmdir()
+        (self.project_root / "subdir").symlink_to(tmp_path_factory.mktemp("outside"))
 
-        assert result["status_code"] == 0
-        # The output should contain the full string "123 $(echo 456)"
-        assert "123 $(echo 456)" in result["stdout"]
+        with pytest.raises(ExecutionError) as context:
+            self.executor.execute_action(action, {})
 
-    def test_execute_command_with_insecure_string_prevents_backtick_injection(self):
-        """Test that insecure string parameters don't allow backtick command injection."""
+        assert "Invalid run_path 'subdir'" in str(context.value)
+
+    @pytest.mark.parametrize(
+        "payload",
+        [
+            "123 && echo 456",
+            "123; echo 456",
+            "123 | echo 456",
+            "123 > test.txt",
+            "123 $(echo 456)",
+            "123 `echo 456`",
+        ],
+        ids=["and", "semicolon", "pipe", "redirect", "subshell", "backtick"],
+    )
+    def test_execute_command_with_insecure_string_prevents_injection(self, payload):
+        """Test that insecure string parameters don't allow command injection."""
         action = Action(
             name="echo_insecure",
             description="Echo insecure string",
@@ -275,12 +199,17 @@ class TestExecutor:
             ],
         )
 
-        # Test backtick command injection
-        result = self.executor.execute_action(action, {"MESSAGE": "123 `echo 456`"})
+        # If vulnerable to injection, the shell would interpret the operators and
+        # run "echo 456" as a separate command
+        result = self.executor.execute_action(action, {"MESSAGE": payload})
 
         assert result["status_code"] == 0
-        # The output should contain the full string "123 `echo 456`"
-        assert "123 `echo 456`" in result["stdout"]
+        # The output should contain the full string, passed as a single argument
+        assert payload in result["stdout"]
+        # It should not contain "456" on a separate line
+        assert "456" not in result["stdout"].split("\n")
+        # Redirects are not applied
+        assert not (self.project_root / "test.txt").exists()
 
     def test_execute_command_with_required_env_var_substitution(self):
         """Test that required_env_var parameters get substituted in commands.
@@ -323,9 +252,8 @@ class TestExecutor:
             else:
                 os.environ["TEST_MESSAGE"] = original_value
 
-    def test_execute_command_with_timeout(self):
+    def test_execute_command_with_timeout(self, monkeypatch):
         """Test that the timeout parameter is respected."""
-        # Create an action with a short timeout (1 second)
         action = Action(
             name="sleep_test",
             description="Sleep test",
@@ -333,24 +261,206 @@ class TestExecutor:
             timeout=1,  # 1 second timeout
         )
 
+        # Step the clock up to the deadline instead of waiting for it: set it at
+        # 0, read it again just before the timeout (still running) and then at
+        # the timeout. The process is still real, so killing and reaping it is
+        # exercised.
+        clock = [0.0, action.timeout - 0.01, float(action.timeout)]
+        monkeypatch.setattr("hooks_mcp.executor.monotonic", lambda: clock.pop(0))
+        waits = []
+        original_wait = subprocess.Popen.wait
+
+        def wait(process, timeout=None):
+            waits.append(timeout)
+            return original_wait(process, timeout)
+
+        monkeypatch.setattr(subprocess.Popen, "wait", wait)
+
         # Execute the action and expect a timeout error
         with pytest.raises(ExecutionError) as context:
             self.executor.execute_action(action, {})
 
         # Verify the error message contains the correct timeout value
         assert "timed out after 1 seconds" in str(context.value)
+        # The timeout fired at the last reading, not before (a later deadline
+        # would have read the clock past its end)
+        assert clock == []
+        # The killed process was reaped
+        assert waits == [None]
+
+    @pytest.mark.parametrize("use_selector", [True, False])
+    def test_execute_command_timeout_with_background_process(
+        self, monkeypatch, use_selector
+    ):
+        """Test that a background process holding the output pipes can't outlive the timeout."""
+        monkeypatch.setattr("hooks_mcp.executor._USE_SELECTOR", use_selector)
+        action = Action(
+            name="background_test",
+            description="Background process test",
+            command="sh -c 'sleep 2 & echo started'",
+            timeout=1,
+        )
+
+        processes = []
+        original_popen = subprocess.Popen
+
+        def popen(*args, **kwargs):
+            processes.append(original_popen(*args, **kwargs))
+            return processes[-1]
+
+        monkeypatch.setattr(subprocess, "Popen", popen)
+
+        # The clock reaches the deadline as soon as the command itself has
+        # exited, while the backgrounded sleep still holds its output pipes
+        clock = iter([0.0])
+
+        def monotonic():
+            now = next(clock, None)
+            if now is not None:
+                return now
+            exited = processes[0].poll() is not None
+            return action.timeout if exited else action.timeout - 0.01
+
+        monkeypatch.setattr("hooks_mcp.executor.monotonic", monotonic)
+
+        with pytest.raises(ExecutionError) as context:
+            self.executor.execute_action(action, {})
+
+        assert "timed out after 1 seconds" in str(context.value)
+        # The command exited on its own; only the held pipes were outstanding
+        assert processes[0].returncode == 0
 
-    def test_execute_command_with_default_timeout(self):
+    def test_execute_command_with_default_timeout(self, monkeypatch):
         """Test that the default timeout is used when not specified."""
         # Create an action without specifying timeout (should default to 60 seconds)
         action = Action(
-            name="sleep_test_default",
-            description="Sleep test with default timeout",
-            command="sleep 1",  # This will complete within the default timeout
+            name="echo_test_default",
+            description="Echo test with default timeout",
+            command="echo done",
         )
+        assert action.timeout == 60
+
+        waits = []
+        original_wait = subprocess.Popen.wait
+
+        def wait(process, timeout=None):
+            waits.append(timeout)
+            return original_wait(process, timeout)
+
+        monkeypatch.setattr(subprocess.Popen, "wait", wait)
 
         # Execute the action - it should complete successfully
         result = self.executor.execute_action(action, {})
 
         assert result["status_code"] == 0
         assert result["stderr"] == ""
+        # The exit is waited for with what's left of the 60 second deadline
+        assert len(waits) == 1
+        assert 59 < waits[0] <= 60
+
+    def test_execute_command_inherits_environment(self, monkeypatch):
+        """Test that the process environment is passed to the command."""
+        monkeypatch.setenv("HOOKS_MCP_INHERITED", "inherited value")
+
+        # Without parameters the environment is inherited as-is
+        action = Action(
+            name="printenv_test",
+            description="Print env var",
+            command="printenv HOOKS_MCP_INHERITED",
+        )
+        result = self.executor.execute_action(action, {})
+        assert result["stdout"] == "inherited value"
+
+        # With parameters they are added on top of the environment
+        action = Action(
+            name="printenv_param_test",
+            description="Print env vars",
+            command="printenv HOOKS_MCP_INHERITED MESSAGE",
+            parameters=[
+                ActionParameter(
+                    "MESSAGE", ParameterType.INSECURE_STRING, "Message to print"
+                )
+            ],
+        )
+        result = self.executor.execute_action(action, {"MESSAGE": "hello"})
+        assert result["stdout"] == "inherited value\nhello"
+
+    def test_execute_command_collapses_carriage_returns(self):
+        """Test that progress output overwritten by carriage returns is collapsed."""
+        action = Action(
+            name="progress_test",
+            description="Progress output",
+            command="printf '1%%\\r50%%\\r100%%\\nDone\\n'",
+        )
+
+        result = self.executor.execute_action(action, {})
+
+        assert result["status_code"] == 0
+        assert result["stdout"] == "100%\nDone"
+
+    def test_execute_command_with_invalid_utf8_output(self):
+        """Test that undecodable output is replaced rather than failing the action."""
+        action = Action(
+            name="binary_test",
+            description="Invalid UTF-8 output",
+            command="printf 'ok \\377'",
+        )
+
+        result = self.executor.execute_action(action, {})
+
+        assert result["status_code"] == 0
+        assert result["stdout"] == "ok �"
+
+    def test_execute_command_truncates_large_output(self, monkeypatch):
+        """Test that output beyond the size cap is dropped and marked as truncated."""
+        monkeypatch.setattr("hooks_mcp.executor.MAX_OUTPUT_BYTES", 10)
+        action = Action(
+            name="large_output",
+            description="Large output",
+            command="sh -c 'printf 0123456789abcdef; printf ok >&2'",
+        )
+
+        result = self.executor.execute_action(action, {})
+
+        assert result["status_code"] == 0
+        assert result["stdout"] == "0123456789\n(output truncated)"
+        assert result["stderr"] == "ok"
+
+    def test_execute_command_with_reader_threads(self, monkeypatch):
+        """Test the reader thread fallback used where pipes can't be selected."""
+        monkeypatch.setattr("hooks_mcp.executor._USE_SELECTOR", False)
+        monkeypatch.setattr("hooks_mcp.executor.MAX_OUTPUT_BYTES", 10)
+        action = Action(
+            name="threaded_output",
+            description="Threaded output",
+            command="sh -c 'printf 0123456789abcdef; printf ok >&2'",
+        )
+
+        result = self.executor.execute_action(action, {})
+
+        assert result["status_code"] == 0
+        assert result["stdout"] == "0123456789\n(output truncated)"
+        assert result["stderr"] == "ok"
+
+    def test_execute_command_with_missing_project_file_path(self):
+        """Test that a project_file_path that doesn't exist raises an error."""
+        action = Action(
+            name="cat_test",
+            description="Cat test file",
+            command="cat $TEST_FILE",
+            parameters=[
+                ActionParameter(
+                    "TEST_FILE", ParameterType.PROJECT_FILE_PATH, "Test file to cat"
+                )
+            ],
+        )
+
+        with pytest.raises(ExecutionError) as context:
+            self.executor.execute_action(action, {"TEST_FILE": "tests/missing.py"})
+
+        assert "does not exist" in str(context.value)
+
+        # A file created afterwards is picked up straight away
+        (self.project_root / "tests" / "missing.py").touch()
+        result = self.executor.execute_action(action, {"TEST_FILE": "tests/missing.py"})
+        assert result["status_code"] == 0
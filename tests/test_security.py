@@ -259,6 +259,54 @@ class TestSecurity:
         # But dangerous nonexistent paths should still be rejected
         assert not validate_project_path("../nonexistent.py", self.project_root)
 
+    def test_validate_project_path_symlink_escape(self):
+        """Test that symlinks pointing outside the project are rejected."""
+        with tempfile.TemporaryDirectory() as outside_dir:
+            (Path(outside_dir) / "secret.txt").touch()
+            (self.project_root / "link").symlink_to(outside_dir)
+
+            assert not validate_project_path("link/secret.txt", self.project_root)
+            assert not validate_project_path("link", self.project_root)
+
+    def test_validate_project_path_symlink_loop(self):
+        """Test that paths through a symlink loop are rejected."""
+        (self.project_root / "loop").symlink_to("loop")
+
+        assert not validate_project_path("loop", self.project_root)
+        assert not validate_project_path("loop/x", self.project_root)
+        assert not validate_project_path("missing/../loop", self.project_root)
+
+    def test_validate_project_path_sibling_with_common_prefix(self):
+        """Test that a sibling directory sharing the root's name prefix is rejected."""
+        sibling = Path(str(self.project_root) + "-evil")
+        sibling.mkdir()
+        try:
+            assert not validate_project_path(str(sibling), self.project_root)
+            assert not validate_project_path(
+                f"../{sibling.name}/file.txt", self.project_root
+            )
+        finally:
+            sibling.rmdir()
+
+    def test_validate_project_path_with_resolved_root(self):
+        """Test validation against a root that has already been resolved."""
+        resolved_root = self.project_root.resolve()
+
+        assert validate_project_path(
+            "tests/test1.py", resolved_root, root_is_resolved=True
+        )
+        assert not validate_project_path(
+            "../outside.py", resolved_root, root_is_resolved=True
+        )
+
+    def test_command_executor_caches_resolved_project_root(self):
+        """Test that setting project_root also caches its resolved form."""
+        executor = CommandExecutor()
+        executor.project_root = self.project_root
+
+        assert executor.project_root == self.project_root
+        assert executor._resolved_project_root == self.project_root.resolve()
+
     def test_command_executor_safe_path(self):
         """Test that command executor accepts safe paths."""
         action = Action(
@@ -1,5 +1,8 @@
 import asyncio
+import subprocess
+import sys
 import tempfile
+import threading
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
@@ -23,8 +26,10 @@ from hooks_mcp.server import (
     create_prompt_definitions,
     create_tool_definitions,
     get_prompt_content,
+    get_version,
     main,
     serve,
+    substitute_prompt_arguments,
 )
 
 
@@ -319,8 +324,8 @@ class TestServe:
             actions=[action],
         )
 
-    @patch("hooks_mcp.server.stdio_server")
-    @patch("hooks_mcp.server.Server")
+    @patch("mcp.server.stdio.stdio_server")
+    @patch("mcp.server.Server")
     @patch("hooks_mcp.server.CommandExecutor")
     def test_serve_setup(
         self, mock_executor_class, mock_server_class, mock_stdio_server, mock_config
@@ -362,8 +367,8 @@ class TestServe:
             raise_exceptions=True,
         )
 
-    @patch("hooks_mcp.server.stdio_server")
-    @patch("hooks_mcp.server.Server")
+    @patch("mcp.server.stdio.stdio_server")
+    @patch("mcp.server.Server")
     @patch("hooks_mcp.server.CommandExecutor")
     def test_list_tools_handler(
         self, mock_executor_class, mock_server_class, mock_stdio_server, mock_config
@@ -412,8 +417,8 @@ class TestServe:
         assert tools[0].name == "test_action"
         assert tools[0].description == "Test action"
 
-    @patch("hooks_mcp.server.stdio_server")
-    @patch("hooks_mcp.server.Server")
+    @patch("mcp.server.stdio.stdio_server")
+    @patch("mcp.server.Server")
     @patch("hooks_mcp.server.CommandExecutor")
     def test_call_tool_handler_success(
         self, mock_executor_class, mock_server_class, mock_stdio_server, mock_config
@@ -480,8 +485,63 @@ class TestServe:
         assert "Exit code: 0" in result[0].text
         assert "STDOUT:\nHello World" in result[0].text
 
-    @patch("hooks_mcp.server.stdio_server")
-    @patch("hooks_mcp.server.Server")
+    @patch("mcp.server.stdio.stdio_server")
+    @patch("mcp.server.Server")
+    @patch("hooks_mcp.server.CommandExecutor")
+    def test_call_tool_handler_runs_actions_concurrently(
+        self, mock_executor_class, mock_server_class, mock_stdio_server, mock_config
+    ):
+        """Test that a running action doesn't block other tool calls."""
+        # Setup mocks
+        mock_stdio_server.return_value.__aenter__.return_value = (
+            MagicMock(),
+            MagicMock(),
+        )
+        mock_server = MagicMock()
+        mock_server.create_initialization_options.return_value = {}
+        mock_server.run = AsyncMock()
+        mock_server_class.return_value = mock_server
+
+        # Each action blocks until both have started, which would deadlock
+        # if call_tool ran them one at a time on the event loop
+        both_started = threading.Barrier(2, timeout=5)
+
+        def execute_action(action, arguments):
+            both_started.wait()
+            return {"status_code": 0, "stdout": "done", "stderr": ""}
+
+        mock_executor = MagicMock()
+        mock_executor.execute_action.side_effect = execute_action
+        mock_executor_class.return_value = mock_executor
+
+        # Capture handlers
+        registered_handlers = {}
+
+        def capture_call_tool():
+            def decorator(func):
+                registered_handlers["call_tool"] = func
+                return func
+
+            return decorator
+
+        mock_server.call_tool = capture_call_tool
+
+        # Run serve to register handlers
+        asyncio.run(serve(mock_config, Path(".")))
+
+        async def call_twice():
+            return await asyncio.gather(
+                registered_handlers["call_tool"]("test_action", {}),
+                registered_handlers["call_tool"]("test_action", {}),
+            )
+
+        results = asyncio.run(call_twice())
+
+        assert len(results) == 2
+        assert all("STDOUT:\ndone" in result[0].text for result in results)
+
+    @patch("mcp.server.stdio.stdio_server")
+    @patch("mcp.server.Server")
     @patch("hooks_mcp.server.CommandExecutor")
     def test_call_tool_handler_action_not_found(
         self, mock_executor_class, mock_server_class, mock_stdio_server, mock_config
@@ -529,8 +589,8 @@ class TestServe:
 
         assert "Action 'nonexistent_action' not found" in str(exc_info.value)
 
-    @patch("hooks_mcp.server.stdio_server")
-    @patch("hooks_mcp.server.Server")
+    @patch("mcp.server.stdio.stdio_server")
+    @patch("mcp.server.Server")
     @patch("hooks_mcp.server.CommandExecutor")
     def test_call_tool_handler_execution_error(
         self, mock_executor_class, mock_server_class, mock_stdio_server, mock_config
@@ -584,8 +644,8 @@ class TestServe:
 
         assert "Test execution error" in str(exc_info.value)
 
-    @patch("hooks_mcp.server.stdio_server")
-    @patch("hooks_mcp.server.Server")
+    @patch("mcp.server.stdio.stdio_server")
+    @patch("mcp.server.Server")
     @patch("hooks_mcp.server.CommandExecutor")
     def test_call_tool_handler_unexpected_error(
         self, mock_executor_class, mock_server_class, mock_stdio_server, mock_config
@@ -640,8 +700,8 @@ class TestServe:
             in str(exc_info.value)
         )
 
-    @patch("hooks_mcp.server.stdio_server")
-    @patch("hooks_mcp.server.Server")
+    @patch("mcp.server.stdio.stdio_server")
+    @patch("mcp.server.Server")
     @patch("hooks_mcp.server.CommandExecutor")
     def test_list_prompts_handler(
         self, mock_executor_class, mock_server_class, mock_stdio_server, mock_config
@@ -719,8 +779,8 @@ class TestServe:
         assert prompts[0].name == "test_prompt1"
         assert prompts[1].name == "test_prompt2"
 
-    @patch("hooks_mcp.server.stdio_server")
-    @patch("hooks_mcp.server.Server")
+    @patch("mcp.server.stdio.stdio_server")
+    @patch("mcp.server.Server")
     @patch("hooks_mcp.server.CommandExecutor")
     def test_get_prompt_handler_success(
         self, mock_executor_class, mock_server_class, mock_stdio_server, mock_config
@@ -797,8 +857,8 @@ class TestServe:
         assert prompt_message.content.type == "text"
         assert prompt_message.content.text == "Test prompt content"
 
-    @patch("hooks_mcp.server.stdio_server")
-    @patch("hooks_mcp.server.Server")
+    @patch("mcp.server.stdio.stdio_server")
+    @patch("mcp.server.Server")
     @patch("hooks_mcp.server.CommandExecutor")
     def test_get_prompt_handler_prompt_not_found(
         self, mock_executor_class, mock_server_class, mock_stdio_server, mock_config
@@ -870,8 +930,8 @@ class TestServe:
 
         assert "Prompt 'nonexistent_prompt' not found" in str(exc_info.value)
 
-    @patch("hooks_mcp.server.stdio_server")
-    @patch("hooks_mcp.server.Server")
+    @patch("mcp.server.stdio.stdio_server")
+    @patch("mcp.server.Server")
     @patch("hooks_mcp.server.CommandExecutor")
     def test_get_prompt_handler_with_argument_substitution(
         self, mock_executor_class, mock_server_class, mock_stdio_server, mock_config
@@ -962,8 +1022,8 @@ class TestServe:
             == "Please analyze the following code:\ndef hello_world():\n    print('Hello, World!')\nProvide feedback."
         )
 
-    @patch("hooks_mcp.server.stdio_server")
-    @patch("hooks_mcp.server.Server")
+    @patch("mcp.server.stdio.stdio_server")
+    @patch("mcp.server.Server")
     @patch("hooks_mcp.server.CommandExecutor")
     def test_call_tool_handler_get_prompt_with_filter_success(
         self, mock_executor_class, mock_server_class, mock_stdio_server
@@ -1058,8 +1118,8 @@ class TestServe:
         assert result[0].type == "text"
         assert result[0].text == "This prompt is allowed"
 
-    @patch("hooks_mcp.server.stdio_server")
-    @patch("hooks_mcp.server.Server")
+    @patch("mcp.server.stdio.stdio_server")
+    @patch("mcp.server.Server")
     @patch("hooks_mcp.server.CommandExecutor")
     def test_call_tool_handler_get_prompt_filtered_out(
         self, mock_executor_class, mock_server_class, mock_stdio_server
@@ -1158,8 +1218,8 @@ class TestServe:
             exc_info.value
         )  # Should mention available prompts
 
-    @patch("hooks_mcp.server.stdio_server")
-    @patch("hooks_mcp.server.Server")
+    @patch("mcp.server.stdio.stdio_server")
+    @patch("mcp.server.Server")
     @patch("hooks_mcp.server.CommandExecutor")
     def test_call_tool_handler_get_prompt_empty_filter(
         self, mock_executor_class, mock_server_class, mock_stdio_server
@@ -1251,6 +1311,36 @@ class TestServe:
 class TestMain:
     """Test the main function."""
 
+    def test_get_version(self):
+        """Test that the version is read from package metadata."""
+        with patch("importlib.metadata.version", return_value="1.2.3"):
+            assert get_version() == "hooks-mcp 1.2.3"
+
+    def test_get_version_not_installed(self):
+        """Test the version message when package metadata is unavailable."""
+        from importlib.metadata import PackageNotFoundError
+
+        with patch(
+            "importlib.metadata.version", side_effect=PackageNotFoundError("hooks-mcp")
+        ):
+            assert get_version() == "hooks-mcp: cannot load version"
+
+    def test_import_does_not_load_mcp(self):
+        """Test that importing the server module defers importing mcp."""
+        result = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, hooks_mcp.server; print('mcp' in sys.modules)",
+            ],
+            cwd=Path(__file__).parent.parent,
+            capture_output=True,
+            text=True,
+        )
+
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == "False"
+
     def test_main_default_config_path(self):
         """Test main function with default config path."""
         test_args = ["test_program"]
@@ -1352,20 +1442,15 @@ class TestMain:
             assert "Failed to change working directory" in mock_print.call_args[0][0]
             mock_exit.assert_called_once_with(1)
 
-    def test_main_config_file_not_found(self):
+    def test_main_config_file_not_found(self, tmp_path):
         """Test main function when config file doesn't exist."""
-        test_args = ["test_program", "missing_config.yaml"]
+        test_args = ["test_program", str(tmp_path / "missing_config.yaml")]
 
         with (
             patch("sys.argv", test_args),
-            patch("hooks_mcp.server.Path") as mock_path,
             patch("builtins.print") as mock_print,
             patch("sys.exit") as mock_exit,
         ):
-            # Mock path exists check to return False
-            mock_path_obj = MagicMock()
-            mock_path_obj.exists.return_value = False
-            mock_path.return_value = mock_path_obj
             # Mock sys.exit to raise SystemExit to stop execution
             mock_exit.side_effect = SystemExit(1)
 
@@ -1375,7 +1460,7 @@ class TestMain:
             # Verify error was printed and exit was called
             mock_print.assert_called_once()
             assert "Configuration file" in mock_print.call_args[0][0]
-            assert "not found" in mock_print.call_args[0][0]
+            assert "missing_config.yaml' not found" in mock_print.call_args[0][0]
             mock_exit.assert_called_once_with(1)
 
     def test_main_config_error(self):
@@ -1678,6 +1763,33 @@ class TestGetPromptContent:
         # Clean up
         prompt_file_path.unlink()
 
+    def test_get_prompt_content_file_cached_until_changed(self):
+        """Test that prompt file content is cached until the file changes."""
+        with tempfile.NamedTemporaryFile(mode="w", suffix=".md", delete=False) as f:
+            f.write("Original content")
+            f.flush()
+            prompt_file_path = Path(f.name)
+
+        prompt = ConfigPrompt(
+            name="test_prompt",
+            description="Test prompt description",
+            prompt_file=str(prompt_file_path),
+        )
+        config_path = prompt_file_path.parent
+
+        assert get_prompt_content(prompt, config_path) == "Original content"
+
+        # An unchanged file is served from the cache without being opened
+        with patch("builtins.open", side_effect=AssertionError("file read again")):
+            assert get_prompt_content(prompt, config_path) == "Original content"
+
+        # Edits are picked up
+        prompt_file_path.write_text("Updated prompt content")
+        assert get_prompt_content(prompt, config_path) == "Updated prompt content"
+
+        # Clean up
+        prompt_file_path.unlink()
+
     def test_get_prompt_content_file_not_found(self):
         """Test getting prompt content from a non-existent file."""
         prompt = ConfigPrompt(
@@ -1692,3 +1804,32 @@ class TestGetPromptContent:
 
         assert "Failed to read prompt file" in str(exc_info.value)
         assert "./nonexistent_file.md" in str(exc_info.value)
+
+
+class TestSubstitutePromptArguments:
+    """Test the substitute_prompt_arguments function."""
+
+    def test_substitutes_arguments(self):
+        """Test that every occurrence of a template variable is replaced."""
+        content = substitute_prompt_arguments(
+            "Review {{CODE}} in {{LANGUAGE}}. Again: {{CODE}}",
+            {"CODE": "x = 1", "LANGUAGE": "Python"},
+        )
+
+        assert content == "Review x = 1 in Python. Again: x = 1"
+
+    def test_unknown_variables_are_left_as_is(self):
+        """Test that variables without an argument are not replaced."""
+        content = substitute_prompt_arguments(
+            "{{KNOWN}} and {{UNKNOWN}}", {"KNOWN": 42}
+        )
+
+        assert content == "42 and {{UNKNOWN}}"
+
+    def test_substituted_values_are_not_substituted_again(self):
+        """Test that templates inside argument values are inserted literally."""
+        content = substitute_prompt_arguments(
+            "{{FIRST}} {{SECOND}}", {"FIRST": "{{SECOND}}", "SECOND": "value"}
+        )
+
+        assert content == "{{SECOND}} value"
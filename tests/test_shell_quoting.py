@@ -154,3 +154,31 @@ def test_parameter_name_collision_substring():
         assert "First Value and Second Value" == result["stdout"]
     finally:
         temp_dir.cleanup()
+
+
+def test_substituted_values_are_not_substituted_again():
+    """Test that a parameter value containing another placeholder is passed through literally."""
+
+    temp_dir = tempfile.TemporaryDirectory()
+    project_root = Path(temp_dir.name)
+
+    executor = CommandExecutor()
+    executor.project_root = project_root
+
+    action = Action(
+        name="nested_test",
+        description="Test nested placeholders",
+        command="echo $AB $A",
+        parameters=[
+            ActionParameter("A", ParameterType.INSECURE_STRING, "Parameter 1"),
+            ActionParameter("AB", ParameterType.INSECURE_STRING, "Parameter 2"),
+        ],
+    )
+
+    try:
+        result = executor.execute_action(action, {"A": "First", "AB": "$A"})
+
+        # The value of $AB must not be expanded using $A
+        assert "$A First" == result["stdout"]
+    finally:
+        temp_dir.cleanup()
@@ -178,3 +178,20 @@ class TestProcessTerminalOutput:
         text = "Cloning into 'repo'...\nremote: Counting objects: 1%\r\033[Kremote: Counting objects: 50%\r\033[Kremote: Counting objects: 100%\r\033[Kremote: Compressing objects: 1%\r\033[Kremote: Compressing objects: 100%\r\033[K"
         result = process_terminal_output(text)
         assert result == "Cloning into 'repo'..."
+
+    def test_process_windows_line_endings(self):
+        """Test that CRLF line endings are treated as newlines, not overwrites."""
+        text = "Line 1\r\nLine 2\r\n"
+        result = process_terminal_output(text)
+        assert result == "Line 1\nLine 2"
+
+        # Progress updates followed by a CRLF keep the final state
+        text = "1%\r50%\r100%\r\nDone\r\n"
+        result = process_terminal_output(text)
+        assert result == "100%\nDone"
+
+    def test_process_plain_output(self):
+        """Test that output without control characters is only stripped."""
+        text = "\n  Line 1\nLine 2\n\n"
+        result = process_terminal_output(text)
+        assert result == "Line 1\nLine 2"